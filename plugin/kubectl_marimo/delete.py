@@ -5,9 +5,9 @@ from pathlib import Path
 
 import click
 
-from .formats import parse_file
+from .formats import parse_file_frontmatter
 from .k8s import delete_resource, exec_in_pod, patch_resource
-from .resources import compute_hash, resource_name, detect_content_type
+from .resources import compute_file_hash, resource_name, detect_content_type
 from .swap import read_swap_file, delete_swap_file
 from .sync import sync_local_mounts
 
@@ -26,13 +26,23 @@ def delete_notebook(
         click.echo(f"Error: File '{file_path}' not found", err=True)
         sys.exit(1)
 
-    # Parse file to get resource name
-    content, frontmatter = parse_file(file_path)
-    name = resource_name(file_path, frontmatter)
-
     # Read swap file for sync
     meta = read_swap_file(file_path)
 
+    # Resource name and content type are cached in the swap file; only
+    # parse the file when they are not available
+    if meta is None:
+        _, frontmatter = parse_file_frontmatter(file_path)
+        name = resource_name(file_path, frontmatter)
+        content_type = None
+    else:
+        name = meta.name
+        content_type = meta.content_type
+        if content_type is None:
+            # Swap files from older versions have no content type; a
+            # marimo fence may sit past the head, so check the full file
+            content_type = detect_content_type(path.read_text())
+
     # Use namespace from swap file if not specified
     # If no swap file, leave as None to let kubectl use context namespace
     if namespace is None and meta:
@@ -44,7 +54,7 @@ def delete_notebook(
 
         # Check for local modifications
         if not force:
-            current_hash = compute_hash(path.read_text())
+            current_hash = compute_file_hash(path)
             if current_hash != meta.file_hash:
                 click.echo(f"Warning: Local file '{file_path}' modified since deploy.")
                 if not click.confirm("Overwrite with pod content?"):
@@ -54,7 +64,6 @@ def delete_notebook(
                     return
 
         # Determine notebook filename in pod
-        content_type = detect_content_type(content or "")
         if content_type == "markdown":
             notebook_file = "notebook.md"
         else:
@@ -68,10 +77,12 @@ def delete_notebook(
         )
 
         if not success:
-            click.echo(f"Warning: Could not sync from pod: {pod_content}", err=True)
+            error = pod_content.decode(errors="replace")
+            click.echo(f"Warning: Could not sync from pod: {error}", err=True)
             click.echo("Continuing with delete...")
         else:
-            path.write_text(pod_content)
+            # Raw bytes from the pod; no decode/encode round trip
+            path.write_bytes(pod_content)
             click.echo(f"Synced content to {file_path}")
 
         # Also sync local mounts if present
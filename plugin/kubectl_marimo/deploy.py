@@ -6,18 +6,39 @@ import re
 import socket
 import subprocess
 import sys
+import threading
 import time
 import webbrowser
 from pathlib import Path
 
 import click
 
-from .formats import parse_file
+from .formats import parse_content
 from .k8s import apply_resource
-from .resources import build_marimo_notebook, resource_name, compute_hash, to_yaml
-from .swap import read_swap_file, write_swap_file, create_swap_meta
+from .resources import (
+    build_marimo_notebook,
+    resource_name,
+    compute_hash,
+    normalize_newlines,
+    detect_content_type,
+    to_yaml,
+)
+from .swap import (
+    read_swap_file,
+    write_swap_file,
+    create_swap_meta,
+    swap_file_path,
+)
 from .sync import sync_notebook
 
+# marimo logs: "URL: http://0.0.0.0:2718?access_token=ABC123"
+_TOKEN_RE = re.compile(r'access_token=([^\s&"]+)')
+
+# kubectl port-forward prints: "Forwarding from 127.0.0.1:2718 -> 2718".
+# Only the IPv4 listener counts: a bare [::1] listener means 127.0.0.1 was
+# taken (e.g. by a local marimo) and the URL could reach the wrong server.
+_FORWARD_RE = re.compile(r"Forwarding from 127\.0\.0\.1:(\d+)")
+
 
 def ensure_cw_credentials(namespace: str | None) -> bool:
     """Create cw-credentials secret from ~/.s3cfg if needed.
@@ -338,33 +359,10 @@ def deploy_notebook(
         headless: Deploy without port-forward or browser
         force: Overwrite without prompting
     """
-    path = Path(file_path)
-
-    # Handle directory case (edit without file)
-    if path.is_dir():
-        # For directory mode, we deploy the directory itself
-        content = None
-        frontmatter = None
-        name = resource_name(file_path, None)
-    else:
-        # Check for existing deployment
-        existing = read_swap_file(file_path)
-        if existing and not force:
-            current_hash = compute_hash(path.read_text())
-            if current_hash != existing.file_hash:
-                click.echo(
-                    f"Warning: Local file '{file_path}' modified since last deploy."
-                )
-                if not click.confirm("Continue and overwrite tracking?"):
-                    click.echo("Deploy cancelled")
-                    return
-
-        # Parse file content and frontmatter
-        content, frontmatter = parse_file(file_path)
-        if content is None:
-            click.echo(f"Error: Could not parse '{file_path}'", err=True)
-            sys.exit(1)
-        name = resource_name(file_path, frontmatter)
+    parsed = _check_existing_and_parse(file_path, force)
+    if parsed is None:
+        return
+    content, frontmatter, name, file_hash = parsed
 
     # Build resource (separates local mounts from remote)
     resource, rsync_mounts, sshfs_mounts = build_marimo_notebook(
@@ -409,13 +407,85 @@ def deploy_notebook(
     if rsync_mounts:
         click.echo(f"Waiting for {name} to be ready for local sync...")
         if wait_for_ready(name, namespace):
-            for src, dest, _scheme in rsync_mounts:
-                sync_local_source(name, namespace, src, dest)
+            sync_local_sources(
+                name, namespace, [(src, dest) for src, dest, _ in rsync_mounts]
+            )
         else:
             click.echo("Warning: Pod not ready, skipping local sync", err=True)
 
     # Create swap file for tracking deployment
-    file_hash = compute_hash(content) if content else ""
+    _write_tracking(
+        file_path,
+        name,
+        namespace,
+        file_hash,
+        content,
+        rsync_mounts,
+        sshfs_mounts,
+    )
+
+    # Get port and auth from frontmatter
+    port = 2718
+    if frontmatter and "port" in frontmatter:
+        port = int(frontmatter["port"])
+    auth_disabled = bool(frontmatter and frontmatter.get("auth") == "none")
+
+    if headless:
+        # Print access info for manual port-forward
+        print_access_info(name, namespace, mode, port, auth_disabled, sshfs_mounts)
+    else:
+        # Auto port-forward and open browser
+        open_notebook(name, namespace, port, file_path, sshfs_mounts, auth_disabled)
+
+
+def _check_existing_and_parse(
+    file_path: str, force: bool
+) -> tuple[str | None, dict | None, str, str] | None:
+    """Read and parse a notebook, confirming overwrite of a modified file.
+
+    Returns (content, frontmatter, name, file_hash), or None if the user
+    cancelled. Directories have no content, frontmatter or hash.
+    """
+    path = Path(file_path)
+
+    # Handle directory case (edit without file)
+    if path.is_dir():
+        # For directory mode, we deploy the directory itself
+        return None, None, resource_name(file_path, None), ""
+
+    # Read once: the same bytes feed the hash and the parser, and the
+    # hash is reused for the swap file. Newlines are normalized like
+    # read_text() so CRLF notebooks parse and hash as before.
+    raw = normalize_newlines(path.read_bytes())
+    file_hash = compute_hash(raw)
+
+    # Check for existing deployment
+    existing = read_swap_file(file_path)
+    if existing and not force:
+        if file_hash != existing.file_hash:
+            click.echo(f"Warning: Local file '{file_path}' modified since last deploy.")
+            if not click.confirm("Continue and overwrite tracking?"):
+                click.echo("Deploy cancelled")
+                return None
+
+    # Parse file content and frontmatter
+    content, frontmatter = parse_content(raw.decode("utf-8"), file_path)
+    if content is None:
+        click.echo(f"Error: Could not parse '{file_path}'", err=True)
+        sys.exit(1)
+    return content, frontmatter, resource_name(file_path, frontmatter), file_hash
+
+
+def _write_tracking(
+    file_path: str,
+    name: str,
+    namespace: str | None,
+    file_hash: str,
+    content: str | None,
+    rsync_mounts: list[tuple[str, str, str]],
+    sshfs_mounts: list[tuple[str, str]],
+) -> None:
+    """Write the swap file that tracks a deployment."""
     # Convert mounts to serializable format
     mounts_data = None
     if rsync_mounts:
@@ -428,51 +498,33 @@ def deploy_notebook(
                 for remote, local in sshfs_mounts
             ]
         )
+
     meta = create_swap_meta(
         name=name,
         namespace=namespace,
         original_file=file_path,
         file_hash=file_hash,
         local_mounts=mounts_data,
+        content_type=detect_content_type(content) if content else None,
     )
     write_swap_file(file_path, meta)
-    from .swap import swap_file_path
-
     click.echo(f"Tracking deployment in {swap_file_path(file_path)}")
 
-    # Get port from frontmatter
-    port = 2718
-    if frontmatter and "port" in frontmatter:
-        port = int(frontmatter["port"])
-
-    if headless:
-        # Print access info for manual port-forward
-        print_access_info(name, namespace, mode, frontmatter, sshfs_mounts)
-    else:
-        # Auto port-forward and open browser
-        open_notebook(name, namespace, port, file_path, sshfs_mounts)
-
 
 def print_access_info(
     name: str,
     namespace: str | None,
     mode: str,
-    frontmatter: dict | None,
+    port: int = 2718,
+    auth_disabled: bool = False,
     sshfs_mounts: list[tuple[str, str]] | None = None,
 ) -> None:
     """Print helpful access information after deploy."""
-    port = 2718
-    if frontmatter and "port" in frontmatter:
-        port = int(frontmatter["port"])
-
     click.echo()
     click.echo("To access your notebook:")
     ns_flag = f"-n {namespace} " if namespace is not None else ""
     click.echo(f"  kubectl port-forward {ns_flag}svc/{name} {port}:{port} &")
 
-    # Check auth configuration
-    auth_disabled = frontmatter and frontmatter.get("auth") == "none"
-
     if auth_disabled:
         click.echo(f"  open http://localhost:{port}")
         click.echo()
@@ -503,6 +555,7 @@ def open_notebook(
     port: int,
     file_path: str,
     sshfs_mounts: list[tuple[str, str]] | None = None,
+    auth_disabled: bool = False,
 ) -> None:
     """Port-forward and open browser.
 
@@ -512,12 +565,25 @@ def open_notebook(
         port: Service port
         file_path: Path to local notebook file (for sync on exit)
         sshfs_mounts: List of (remote_path, local_mount) for sshfs mounts
+        auth_disabled: True if auth is disabled (no token to look up)
     """
     # Wait for pod ready
     click.echo(f"Waiting for {name} to be ready...")
     if not wait_for_ready(name, namespace):
         click.echo("Warning: Pod may not be ready, continuing anyway...", err=True)
 
+    # Extract access token from pod logs in the background (marimo may still
+    # be starting) while sshfs mounts and the port-forward are set up. With
+    # auth disabled marimo never prints one, so don't wait for it.
+    token_result: list[str | None] = []
+    token_thread = None
+    if not auth_disabled:
+        token_thread = threading.Thread(
+            target=lambda: token_result.append(get_access_token(name, namespace)),
+            daemon=True,
+        )
+        token_thread.start()
+
     # Set up local sshfs mounts if any
     sshfs_procs: list[tuple[str, subprocess.Popen | None]] = []
     if sshfs_mounts:
@@ -526,19 +592,22 @@ def open_notebook(
             pf_proc = setup_local_sshfs_mount(name, namespace, remote_path, local_mount)
             sshfs_procs.append((local_mount, pf_proc))
 
-    # Extract access token from pod logs (retry a few times as marimo may still be starting)
-    token = None
-    for _ in range(5):
-        token = get_access_token(name, namespace)
-        if token:
-            break
-        time.sleep(1)
+    # Port-forward, preferring the service port locally. kubectl binds the
+    # port itself, so there is no gap between probing and binding.
+    forward = start_port_forward(name, namespace, port)
 
-    # Find available local port
-    local_port = find_available_port(port)
+    # get_access_token() gives up after its own timeout
+    if token_thread is not None:
+        token_thread.join()
+    token = token_result[0] if token_result else None
+
+    if forward is None:
+        click.echo("Error: port-forward failed", err=True)
+        return
+    pf_proc, local_port = forward
 
     # Build URL with token
-    url = f"http://localhost:{local_port}"
+    url = f"http://127.0.0.1:{local_port}"
     if token:
         url = f"{url}?access_token={token}"
 
@@ -550,18 +619,11 @@ def open_notebook(
     webbrowser.open(url)
 
     # Port-forward (blocking)
-    cmd = [
-        "kubectl",
-        "port-forward",
-        f"svc/{name}",
-        f"{local_port}:{port}",
-    ]
-    if namespace is not None:
-        cmd.insert(2, namespace)
-        cmd.insert(2, "-n")
     try:
-        subprocess.run(cmd)
+        pf_proc.wait()
     except KeyboardInterrupt:
+        pf_proc.terminate()
+
         # Clean up sshfs mounts
         if sshfs_procs:
             click.echo("\nCleaning up sshfs mounts...")
@@ -576,25 +638,116 @@ def open_notebook(
         click.echo("Done")
 
 
-def get_access_token(name: str, namespace: str | None) -> str | None:
+def start_port_forward(
+    name: str,
+    namespace: str | None,
+    port: int,
+) -> tuple[subprocess.Popen, int] | None:
+    """Start kubectl port-forward to the notebook service.
+
+    Tries the same local port first and falls back to a kubectl-assigned
+    port if kubectl cannot listen on it (in use, permission denied, ...).
+
+    Args:
+        name: Service name
+        namespace: Kubernetes namespace (None = use kubectl context)
+        port: Service port
+
+    Returns:
+        (port-forward process, local port), or None if port-forward failed
+    """
+    for local_port in (port, 0):
+        cmd = [
+            "kubectl",
+            "port-forward",
+            f"svc/{name}",
+            f"{local_port}:{port}",
+            # Listen on IPv4 only so a port taken there is reported as in use
+            "--address",
+            "127.0.0.1",
+        ]
+        if namespace is not None:
+            cmd.insert(2, namespace)
+            cmd.insert(2, "-n")
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+
+        output = []
+        for line in proc.stdout:
+            match = _FORWARD_RE.search(line)
+            if match:
+                click.echo(line, nl=False)
+                # Keep draining so kubectl never blocks on a full pipe
+                threading.Thread(
+                    target=_echo_lines, args=(proc.stdout,), daemon=True
+                ).start()
+                return proc, int(match.group(1))
+            output.append(line)
+
+        # kubectl exited without forwarding
+        proc.wait()
+        message = "".join(output)
+        # Covers "Unable to listen on port" and "unable to listen on any of
+        # the requested ports"; other errors (e.g. NotFound) are final
+        if local_port == 0 or "unable to listen on" not in message.lower():
+            click.echo(message, nl=False, err=True)
+            return None
+    return None
+
+
+def _echo_lines(stream) -> None:
+    """Echo lines from a process stream until it closes."""
+    for line in stream:
+        click.echo(line, nl=False)
+
+
+def get_access_token(
+    name: str, namespace: str | None, timeout: float = 10.0
+) -> str | None:
     """Extract access token from marimo pod logs.
 
+    Follows the log stream and returns as soon as the token line appears,
+    rather than polling the full logs repeatedly.
+
     Args:
         name: Pod name
         namespace: Kubernetes namespace (None = use kubectl context)
+        timeout: Seconds to wait for the token to be printed
 
     Returns:
         Access token if found, None otherwise
     """
-    cmd = ["kubectl", "logs", name, "-c", "marimo"]
+    cmd = ["kubectl", "logs", name, "-c", "marimo", "-f"]
     if namespace is not None:
         cmd.insert(2, namespace)
         cmd.insert(2, "-n")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
 
-    # marimo logs: "URL: http://0.0.0.0:2718?access_token=ABC123"
-    match = re.search(r'access_token=([^\s&"]+)', result.stdout)
-    return match.group(1) if match else None
+    # Stop following the logs once the deadline passes
+    timer = threading.Timer(timeout, proc.terminate)
+    timer.start()
+    try:
+        for line in proc.stdout:
+            match = _TOKEN_RE.search(line)
+            if match:
+                return match.group(1)
+        return None
+    finally:
+        timer.cancel()
+        proc.terminate()
+        proc.wait()
 
 
 def wait_for_ready(name: str, namespace: str | None, timeout: int = 120) -> bool:
@@ -622,29 +775,38 @@ def wait_for_ready(name: str, namespace: str | None, timeout: int = 120) -> bool
     return result.returncode == 0
 
 
-def sync_local_source(
+def sync_local_sources(
     name: str,
     namespace: str | None,
-    local_path: str,
-    mount_point: str,
+    mounts: list[tuple[str, str]],
 ) -> bool:
-    """Copy local files to pod.
+    """Copy several local paths to pod.
+
+    Target directories are created with a single kubectl exec before
+    copying, and copied .marimo swap files are removed with a single
+    kubectl exec afterwards, so N mounts cost N + 2 kubectl calls.
 
     Args:
         name: Pod name
         namespace: Kubernetes namespace (None = use kubectl context)
-        local_path: Local directory to copy
-        mount_point: Target path inside pod
+        mounts: List of (local_path, mount_point) pairs
 
     Returns:
-        True if sync succeeded
+        True if every sync succeeded
     """
-    path = Path(local_path)
-    if not path.exists():
-        click.echo(f"Warning: Local path '{local_path}' does not exist", err=True)
-        return False
-
-    # Create target directory in pod
+    ok = True
+    existing = []
+    for local_path, mount_point in mounts:
+        if not Path(local_path).exists():
+            click.echo(f"Warning: Local path '{local_path}' does not exist", err=True)
+            ok = False
+            continue
+        existing.append((local_path, mount_point))
+
+    if not existing:
+        return ok
+
+    # Create all target directories in pod
     mkdir_cmd = [
         "kubectl",
         "exec",
@@ -654,39 +816,48 @@ def sync_local_source(
         "--",
         "mkdir",
         "-p",
-        mount_point,
     ]
+    mkdir_cmd.extend(mount_point for _, mount_point in existing)
     if namespace is not None:
         mkdir_cmd.insert(2, namespace)
         mkdir_cmd.insert(2, "-n")
     subprocess.run(mkdir_cmd, capture_output=True)
 
-    # Use kubectl cp to copy files
-    # For directories, copy contents; for files, copy the file
-    if path.is_dir():
-        # Add trailing /. to copy contents into mount_point
-        src = f"{local_path}/."
-    else:
-        src = local_path
+    synced = []
+    for local_path, mount_point in existing:
+        # Use kubectl cp to copy files
+        # For directories, copy contents; for files, copy the file
+        if Path(local_path).is_dir():
+            # Add trailing /. to copy contents into mount_point
+            src = f"{local_path}/."
+        else:
+            src = local_path
+
+        # Build pod reference - use pod/name format with optional -n flag
+        dest = f"pod/{name}:{mount_point}"
+
+        cp_cmd = [
+            "kubectl",
+            "cp",
+            src,
+            dest,
+            "-c",
+            "marimo",
+        ]
+        if namespace is not None:
+            cp_cmd.insert(2, namespace)
+            cp_cmd.insert(2, "-n")
+        result = subprocess.run(cp_cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            click.echo(
+                f"Warning: Failed to sync {local_path}: {result.stderr}", err=True
+            )
+            ok = False
+            continue
+        synced.append((local_path, mount_point))
 
-    # Build pod reference - use pod/name format with optional -n flag
-    dest = f"pod/{name}:{mount_point}"
-
-    cp_cmd = [
-        "kubectl",
-        "cp",
-        src,
-        dest,
-        "-c",
-        "marimo",
-    ]
-    if namespace is not None:
-        cp_cmd.insert(2, namespace)
-        cp_cmd.insert(2, "-n")
-    result = subprocess.run(cp_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        click.echo(f"Warning: Failed to sync {local_path}: {result.stderr}", err=True)
-        return False
+    if not synced:
+        return ok
 
     # Clean up .marimo swap files that may have been copied
     cleanup_cmd = [
@@ -697,18 +868,17 @@ def sync_local_source(
         "marimo",
         "--",
         "find",
-        mount_point,
-        "-name",
-        "*.marimo",
-        "-delete",
     ]
+    cleanup_cmd.extend(mount_point for _, mount_point in synced)
+    cleanup_cmd.extend(["-name", "*.marimo", "-delete"])
     if namespace is not None:
         cleanup_cmd.insert(2, namespace)
         cleanup_cmd.insert(2, "-n")
     subprocess.run(cleanup_cmd, capture_output=True)
 
-    click.echo(f"Synced {local_path} → {mount_point}")
-    return True
+    for local_path, mount_point in synced:
+        click.echo(f"Synced {local_path} → {mount_point}")
+    return ok
 
 
 def find_available_port(preferred: int) -> int:
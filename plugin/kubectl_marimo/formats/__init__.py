@@ -3,18 +3,51 @@
 from pathlib import Path
 from typing import Any
 
-from .markdown import parse_markdown
+from .markdown import FRONTMATTER_START_RE, parse_markdown
 from .python import parse_python
 
+# Frontmatter and PEP 723 headers sit at the top of the file
+HEAD_SIZE = 8192
+
 
 def parse_file(file_path: str) -> tuple[str | None, dict[str, Any] | None]:
     """Parse a notebook file and extract content and frontmatter.
 
     Returns (content, frontmatter) or (None, None) if parsing fails.
     """
-    path = Path(file_path)
-    content = path.read_text()
+    return parse_content(Path(file_path).read_text(), file_path)
+
 
+def parse_file_frontmatter(
+    file_path: str, limit: int = HEAD_SIZE
+) -> tuple[str, dict[str, Any] | None]:
+    """Parse frontmatter from the head of a notebook file.
+
+    Only reads the rest of the file when no frontmatter is found in a
+    truncated head, continuing from the same handle so the file is read once.
+
+    Returns (content, frontmatter), where content is the head unless the
+    rest of the file was read.
+    """
+    with open(file_path) as f:
+        content = f.read(limit)
+        rest = f.read(1)
+        _, frontmatter = parse_content(content, file_path)
+        if frontmatter is None and rest:
+            content += rest + f.read()
+            _, frontmatter = parse_content(content, file_path)
+    return content, frontmatter
+
+
+def parse_content(
+    content: str, file_path: str | Path
+) -> tuple[str | None, dict[str, Any] | None]:
+    """Parse already-read notebook content.
+
+    The parser is chosen from the file suffix, falling back to content
+    detection. Returns (content, frontmatter).
+    """
+    path = Path(file_path)
     if path.suffix == ".md":
         return parse_markdown(content)
     elif path.suffix == ".py":
@@ -24,7 +57,7 @@ def parse_file(file_path: str) -> tuple[str | None, dict[str, Any] | None]:
         return content, None
     else:
         # Try to detect format from content
-        if content.strip().startswith("---"):
+        if FRONTMATTER_START_RE.match(content):
             return parse_markdown(content)
         elif "import marimo" in content or "@app.cell" in content:
             return parse_python(content)
@@ -33,4 +66,10 @@ def parse_file(file_path: str) -> tuple[str | None, dict[str, Any] | None]:
             return content, None
 
 
-__all__ = ["parse_file", "parse_markdown", "parse_python"]
+__all__ = [
+    "parse_content",
+    "parse_file",
+    "parse_file_frontmatter",
+    "parse_markdown",
+    "parse_python",
+]
@@ -5,6 +5,19 @@ from typing import Any
 
 import yaml
 
+# Use the libyaml C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Marimo code blocks: ```python {.marimo} or ```{python marimo}
+MARIMO_BLOCK_RE = re.compile(r"```(?:python\s*\{\.marimo\}|\{python\s+marimo\})")
+
+# Leading "---" after optional whitespace; match() avoids the full copy
+# that content.strip() would make
+FRONTMATTER_START_RE = re.compile(r"\s*---")
+
 
 def parse_markdown(content: str) -> tuple[str, dict[str, Any] | None]:
     """Parse marimo markdown notebook.
@@ -29,26 +42,29 @@ def parse_markdown(content: str) -> tuple[str, dict[str, Any] | None]:
 
 def extract_frontmatter(content: str) -> dict[str, Any] | None:
     """Extract YAML frontmatter from markdown content."""
-    lines = content.split("\n")
-
-    if not lines or lines[0].strip() != "---":
+    # Scan line by line with str.find so only the header is touched,
+    # not the whole notebook body
+    first_end = content.find("\n")
+    if first_end < 0 or content[:first_end].strip() != "---":
         return None
 
     # Find closing ---
-    end_idx = None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            end_idx = i
+    start = first_end + 1
+    pos = start
+    while True:
+        line_end = content.find("\n", pos)
+        line = content[pos:] if line_end < 0 else content[pos:line_end]
+        if line.strip() == "---":
             break
-
-    if end_idx is None:
-        return None
+        if line_end < 0:
+            return None
+        pos = line_end + 1
 
     # Extract raw frontmatter YAML
-    frontmatter_text = "\n".join(lines[1:end_idx])
+    frontmatter_text = content[start:pos]
 
     try:
-        fm = yaml.safe_load(frontmatter_text)
+        fm = yaml.load(frontmatter_text, Loader=_Loader)
         return fm if isinstance(fm, dict) else None
     except yaml.YAMLError:
         return None
@@ -57,11 +73,8 @@ def extract_frontmatter(content: str) -> dict[str, Any] | None:
 def is_marimo_markdown(content: str) -> bool:
     """Check if content looks like a marimo markdown notebook."""
     # Marimo markdown has frontmatter and/or code blocks with marimo syntax
-    has_frontmatter = content.strip().startswith("---")
+    has_frontmatter = FRONTMATTER_START_RE.match(content) is not None
 
-    # Check for marimo code blocks: ```python {.marimo} or ```{python marimo}
-    has_marimo_blocks = bool(
-        re.search(r"```(?:python\s*\{\.marimo\}|\{python\s+marimo\})", content)
-    )
+    has_marimo_blocks = bool(MARIMO_BLOCK_RE.search(content))
 
     return has_frontmatter or has_marimo_blocks
@@ -3,6 +3,10 @@
 import re
 from typing import Any
 
+_PEP723_RE = re.compile(r"# /// script\n((?:# .*\n)*?)# ///")
+_K8S_RE = re.compile(r"# \[tool\.marimo\.k8s\]\n((?:# .*\n)*)")
+_K8S_ENV_RE = re.compile(r"# \[tool\.marimo\.k8s\.env\]\n((?:# .*\n)*)")
+
 
 def parse_python(content: str) -> tuple[str, dict[str, Any] | None]:
     """Parse marimo Python notebook.
@@ -31,8 +35,7 @@ def extract_pep723_metadata(content: str) -> dict[str, Any] | None:
     # storage = "5Gi"
     """
     # Look for PEP 723 script block
-    pattern = r"# /// script\n((?:# .*\n)*?)# ///"
-    match = re.search(pattern, content)
+    match = _PEP723_RE.search(content)
 
     if not match:
         return None
@@ -58,8 +61,7 @@ def extract_pep723_metadata(content: str) -> dict[str, Any] | None:
             metadata[key] = value
 
     # Look for marimo k8s config
-    k8s_pattern = r"# \[tool\.marimo\.k8s\]\n((?:# .*\n)*)"
-    k8s_match = re.search(k8s_pattern, content)
+    k8s_match = _K8S_RE.search(content)
     if k8s_match:
         for line in k8s_match.group(1).split("\n"):
             line = line.lstrip("# ").strip()
@@ -74,8 +76,7 @@ def extract_pep723_metadata(content: str) -> dict[str, Any] | None:
                 metadata[key] = value
 
     # Look for marimo k8s env config
-    env_pattern = r"# \[tool\.marimo\.k8s\.env\]\n((?:# .*\n)*)"
-    env_match = re.search(env_pattern, content)
+    env_match = _K8S_ENV_RE.search(content)
     if env_match:
         env = {}
         for line in env_match.group(1).split("\n"):
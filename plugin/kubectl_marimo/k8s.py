@@ -1,28 +1,31 @@
 """Kubernetes client wrapper."""
 
+import json
 import subprocess
 import sys
 from typing import Any
 
+import yaml
+
+from .resources import to_yaml
+
 
 def apply_resource(resource: dict[str, Any], dry_run: bool = False) -> bool:
     """Apply a Kubernetes resource using kubectl.
 
     Returns True on success, False on failure.
     """
-    import yaml
-
-    yaml_content = yaml.dump(resource, default_flow_style=False)
-
     if dry_run:
-        print(yaml_content)
+        print(to_yaml(resource))
         return True
 
+    # kubectl accepts JSON manifests; json.dumps is much cheaper than YAML.
+    # Compact separators since nobody reads this payload.
     cmd = ["kubectl", "apply", "-f", "-"]
     try:
         result = subprocess.run(
             cmd,
-            input=yaml_content,
+            input=json.dumps(resource, separators=(",", ":")),
             capture_output=True,
             text=True,
         )
@@ -65,9 +68,11 @@ def exec_in_pod(
     pod_name: str,
     namespace: str | None,
     command: str,
-) -> tuple[bool, str]:
+) -> tuple[bool, bytes]:
     """Execute command in pod using kubectl exec.
 
+    Output is returned as raw bytes so file contents are not re-encoded.
+
     Returns (success, output).
     """
     cmd = [
@@ -83,12 +88,12 @@ def exec_in_pod(
         cmd.insert(2, namespace)
         cmd.insert(2, "-n")
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True)
         if result.returncode != 0:
             return False, result.stderr
         return True, result.stdout
     except FileNotFoundError:
-        return False, "kubectl not found in PATH"
+        return False, b"kubectl not found in PATH"
 
 
 def get_pod_logs(pod_name: str, namespace: str | None) -> tuple[bool, str]:
@@ -149,8 +154,6 @@ def get_resource(
 
     Returns (success, resource_dict or error_message).
     """
-    import yaml
-
     cmd = ["kubectl", "get", kind, name, "-o", "yaml"]
     if namespace is not None:
         cmd.insert(4, namespace)
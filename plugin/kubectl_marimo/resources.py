@@ -2,14 +2,28 @@
 
 import hashlib
 import os
-import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable
 
+import yaml
+
+from .formats.markdown import FRONTMATTER_START_RE, MARIMO_BLOCK_RE
+
+# Use the libyaml C emitter when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeDumper as _Dumper
 
 # Default SSH image, configurable via environment
 SSH_IMAGE = os.environ.get("SSH_IMAGE", "linuxserver/openssh-server:latest")
 
+# Default PVC size when frontmatter has no storage setting
+DEFAULT_STORAGE_SIZE = "1Gi"
+
+# Byte translation table for slugify: keeps 0-9 and a-z, maps everything else to "-"
+_SLUG_TABLE = bytes(c if 48 <= c <= 57 or 97 <= c <= 122 else 45 for c in range(256))
+
 
 def parse_mount_uri(uri: str) -> tuple[str, str]:
     """Parse mount URI into (scheme, path).
@@ -19,55 +33,52 @@ def parse_mount_uri(uri: str) -> tuple[str, str]:
         rsync://./data → ('rsync', './data')
         cw://bucket/path → ('cw', 'bucket/path')
     """
-    match = re.match(r"^(\w+)://(.*)$", uri)
-    if not match:
+    scheme, sep, path = uri.partition("://")
+    # Scheme must be word characters only, e.g. not "./data" in "./data://x"
+    if not sep or not scheme.replace("_", "").isalnum():
         raise ValueError(f"Invalid mount URI: {uri}")
-    return (match.group(1), match.group(2))
+    return (scheme, path)
 
 
 def filter_mounts(
-    mounts: list[str],
+    mounts: Iterable[str],
 ) -> tuple[list[str], list[tuple[str, str, str]], list[tuple[str, str]]]:
     """Categorize mounts by scheme.
 
+    Accepts any iterable of URIs (e.g. an itertools.chain); it is consumed once.
+
     Returns:
         (cw_mounts, rsync_mounts, sshfs_mounts)
         - cw_mounts: URIs to pass to CRD (operator handles via s3fs sidecar)
         - rsync_mounts: list of (source_path, mount_point, scheme) for kubectl cp
         - sshfs_mounts: list of (remote_path, local_mount) for local sshfs mount
     """
-    cw_mounts = []
-    rsync_mounts = []
-    sshfs_mounts = []
+    cw_mounts: list[str] = []
+    rsync_mounts: list[tuple[str, str, str]] = []
+    sshfs_mounts: list[tuple[str, str]] = []
 
+    # One pass; the scheme prefix is checked directly, so no URI is parsed
     for i, uri in enumerate(mounts):
-        try:
-            scheme, path = parse_mount_uri(uri)
-
-            if scheme == "cw":
-                # CoreWeave S3 - operator handles
-                cw_mounts.append(uri)
-            elif scheme == "rsync":
-                # Local rsync - plugin handles via kubectl cp
-                # Parse optional mount point: rsync://./data:/mnt/data
-                parts = path.rsplit(":", 1)
-                if len(parts) == 2 and parts[1].startswith("/"):
-                    source, mount = parts
-                else:
-                    source = path
-                    mount = f"/home/marimo/notebooks/mounts/local-{i}"
-                rsync_mounts.append((source, mount, scheme))
-            elif scheme == "sshfs":
-                # Local sshfs - plugin runs sshfs locally to mount pod
-                # sshfs:///home/marimo/notebooks means mount pod's /home/marimo/notebooks locally
-                remote_path = path if path.startswith("/") else f"/{path}"
-                local_mount = f"./marimo-mount-{i}"
-                sshfs_mounts.append((remote_path, local_mount))
+        if uri.startswith("rsync://"):
+            # Local rsync - plugin handles via kubectl cp
+            # Parse optional mount point: rsync://./data:/mnt/data
+            path = uri[len("rsync://") :]
+            sep = path.rfind(":")
+            if sep != -1 and path.startswith("/", sep + 1):
+                source, mount = path[:sep], path[sep + 1 :]
             else:
-                # Unknown scheme - pass through to operator
-                cw_mounts.append(uri)
-        except ValueError:
-            # Invalid URI - pass through to operator
+                source = path
+                mount = f"/home/marimo/notebooks/mounts/local-{i}"
+            rsync_mounts.append((source, mount, "rsync"))
+        elif uri.startswith("sshfs://"):
+            # Local sshfs - plugin runs sshfs locally to mount pod
+            # sshfs:///home/marimo/notebooks means mount pod's /home/marimo/notebooks locally
+            path = uri[len("sshfs://") :]
+            remote_path = path if path.startswith("/") else f"/{path}"
+            local_mount = f"./marimo-mount-{i}"
+            sshfs_mounts.append((remote_path, local_mount))
+        else:
+            # cw://, unknown schemes and invalid URIs - operator handles
             cw_mounts.append(uri)
 
     return cw_mounts, rsync_mounts, sshfs_mounts
@@ -93,33 +104,85 @@ def build_ssh_sidecar(index: int) -> dict[str, Any]:
     }
 
 
-def compute_hash(content: str) -> str:
-    """Compute SHA256 hash of content."""
-    h = hashlib.sha256(content.encode()).hexdigest()[:16]
-    return f"sha256:{h}"
+# Hash constructors for compute_hash(). Only the first 8 bytes of the
+# digest are kept, so blake2b is asked for exactly that much.
+_HASHERS: dict[str, Callable[[bytes], Any]] = {
+    "sha256": hashlib.sha256,
+    "blake2b": lambda data: hashlib.blake2b(data, digest_size=8),
+}
+
+
+def _format_digest(digest: bytes, algorithm: str = "sha256") -> str:
+    """Format a digest like the operator's ContentHash.
+
+    SHA256 stays the default so hashes remain comparable with the
+    operator and with existing swap files.
+    """
+    # Only the first 8 bytes (16 hex chars) are kept, so skip hex-encoding the rest
+    return f"{algorithm}:{digest[:8].hex()}"
+
+
+def compute_hash(content: str | bytes, algorithm: str = "sha256") -> str:
+    """Compute hash of content ("sha256" or "blake2b").
+
+    Bytes are hashed as-is; only str content is UTF-8 encoded first.
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    hasher = _HASHERS.get(algorithm)
+    if hasher is None:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+    return _format_digest(hasher(content).digest(), algorithm)
+
+
+def normalize_newlines(data: bytes) -> bytes:
+    """Translate CRLF and lone CR line endings to LF, as Path.read_text() does.
+
+    Notebooks are hashed and parsed with normalized newlines, so CRLF files
+    match the LF-anchored format parsers and hash like their read_text().
+    """
+    return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+
+def compute_file_hash(path: Path) -> str:
+    """Compute SHA256 hash of a file without decoding it.
+
+    Streams the file in binary chunks with newlines normalized, so the
+    result matches compute_hash(path.read_text()).
+    """
+    h = hashlib.sha256()
+    carry = b""
+    with open(path, "rb") as f:
+        while chunk := f.read(65536):
+            chunk = carry + chunk
+            # Hold back a trailing \r; it may be the first half of \r\n
+            if chunk.endswith(b"\r"):
+                chunk, carry = chunk[:-1], b"\r"
+            else:
+                carry = b""
+            h.update(normalize_newlines(chunk))
+    h.update(normalize_newlines(carry))
+    return _format_digest(h.digest())
 
 
 def slugify(name: str) -> str:
     """Convert name to valid Kubernetes resource name."""
-    import re
-
-    s = name.lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = s.strip("-")
-    return s[:63]  # Max K8s name length
+    # Non-ASCII characters become "?" and then "-", like any other symbol
+    slug = name.lower().encode("ascii", "replace").translate(_SLUG_TABLE)
+    # Dropping empty parts collapses runs of dashes and strips both ends
+    slug = b"-".join(filter(None, slug.split(b"-")))
+    return slug[:63].decode()  # Max K8s name length
 
 
 def resource_name(file_path: str, frontmatter: dict[str, Any] | None = None) -> str:
     """Derive resource name from file path or frontmatter title."""
     if frontmatter and frontmatter.get("title"):
         return slugify(frontmatter["title"])
-    path = Path(file_path)
-    # For directories, use the directory name (resolve "." to actual dir name)
-    if path.is_dir():
-        # path.name is "" for ".", so always resolve to get actual name
-        name = path.name or path.resolve().name
-        return slugify(name)
-    return slugify(path.stem)
+    # For directories, use the directory name (abspath turns "." into the
+    # actual dir name without the extra stat calls of Path.resolve())
+    if os.path.isdir(file_path):
+        return slugify(os.path.basename(os.path.abspath(file_path)))
+    return slugify(os.path.splitext(os.path.basename(file_path))[0])
 
 
 def parse_env(env_dict: dict[str, Any]) -> list[dict[str, Any]]:
@@ -132,25 +195,43 @@ def parse_env(env_dict: dict[str, Any]) -> list[dict[str, Any]]:
             secret: my-secret        # From secret
             key: api-key
     """
-    result = []
-    for name, value in env_dict.items():
-        if isinstance(value, str):
-            # Inline value
-            result.append({"name": name, "value": value})
-        elif isinstance(value, dict) and "secret" in value:
-            # Secret reference
-            result.append(
-                {
-                    "name": name,
-                    "valueFrom": {
-                        "secretKeyRef": {
-                            "name": value["secret"],
-                            "key": value.get("key", name.lower()),
-                        }
-                    },
+    # Entries that are neither a string nor a secret reference are skipped
+    return [
+        {"name": name, "value": value}
+        if isinstance(value, str)
+        else {
+            "name": name,
+            "valueFrom": {
+                "secretKeyRef": {
+                    "name": value["secret"],
+                    "key": value.get("key", name.lower()),
                 }
-            )
-    return result
+            },
+        }
+        for name, value in env_dict.items()
+        if isinstance(value, str) or (isinstance(value, dict) and "secret" in value)
+    ]
+
+
+# Fixed top-level fields of every MarimoNotebook; only holds immutable
+# values, so a shallow copy per resource is enough
+_RESOURCE_TEMPLATE = {
+    "apiVersion": "marimo.io/v1alpha1",
+    "kind": "MarimoNotebook",
+}
+
+# Frontmatter keys copied into the spec, with their conversion. Iterating
+# the table (not the frontmatter) keeps the spec key order stable.
+# A conversion returning None leaves the key unset.
+_FRONTMATTER_SPEC: dict[str, Callable[[Any], Any]] = {
+    "image": lambda v: v,
+    "port": int,
+    # Empty auth block = --no-token
+    "auth": lambda v: {} if v == "none" else None,
+    "env": parse_env,
+    # Resources (CPU, memory, GPU)
+    "resources": lambda v: v,
+}
 
 
 def build_marimo_notebook(
@@ -177,39 +258,29 @@ def build_marimo_notebook(
         - rsync_mounts: list of (source_path, mount_point, scheme) for kubectl cp
         - sshfs_mounts: list of (remote_path, local_mount) for local sshfs
     """
-    spec: dict[str, Any] = {
-        "mode": mode,
-    }
-
-    # Content (file-based deployments, empty string for directory mode)
-    spec["content"] = content if content else ""
-
     # Default storage (PVC by notebook name) - always create PVC
-    storage_size = "1Gi"
+    storage_size = DEFAULT_STORAGE_SIZE
     if frontmatter and "storage" in frontmatter:
         storage_size = frontmatter["storage"]
-    spec["storage"] = {"size": storage_size}
+
+    # Always-present keys go in one literal; content is an empty string
+    # for directory mode
+    spec: dict[str, Any] = {
+        "mode": mode,
+        "content": content if content else "",
+        "storage": {"size": storage_size},
+    }
 
     # Apply frontmatter settings
     if frontmatter:
-        if "image" in frontmatter:
-            spec["image"] = frontmatter["image"]
-        if "port" in frontmatter:
-            spec["port"] = int(frontmatter["port"])
-        if "auth" in frontmatter:
-            if frontmatter["auth"] == "none":
-                spec["auth"] = {}  # Empty auth block = --no-token
-
-        # Environment variables
-        if "env" in frontmatter:
-            spec["env"] = parse_env(frontmatter["env"])
-
-        # Resources (CPU, memory, GPU)
-        if "resources" in frontmatter:
-            spec["resources"] = frontmatter["resources"]
+        for key, convert in _FRONTMATTER_SPEC.items():
+            if key in frontmatter:
+                value = convert(frontmatter[key])
+                if value is not None:
+                    spec[key] = value
 
     # Collect mounts from --source and frontmatter
-    all_mounts = []
+    all_mounts: list[str] = []
     if source:
         all_mounts.append(source)
     if frontmatter and "mounts" in frontmatter:
@@ -224,30 +295,22 @@ def build_marimo_notebook(
             spec["mounts"] = cw_mounts
 
     # Add SSH sidecars for sshfs mounts
-    sidecars = []
-    for i, _ in enumerate(sshfs_mounts):
-        sidecars.append(build_ssh_sidecar(i))
-    if sidecars:
-        spec["sidecars"] = sidecars
+    if sshfs_mounts:
+        spec["sidecars"] = [build_ssh_sidecar(i) for i in range(len(sshfs_mounts))]
 
     metadata = {"name": name}
     if namespace is not None:
         metadata["namespace"] = namespace
 
-    resource = {
-        "apiVersion": "marimo.io/v1alpha1",
-        "kind": "MarimoNotebook",
-        "metadata": metadata,
-        "spec": spec,
-    }
+    resource = {**_RESOURCE_TEMPLATE, "metadata": metadata, "spec": spec}
     return resource, rsync_mounts, sshfs_mounts
 
 
 def to_yaml(resource: dict[str, Any]) -> str:
     """Convert resource dict to YAML string."""
-    import yaml
-
-    return yaml.dump(resource, default_flow_style=False, sort_keys=False)
+    return yaml.dump(
+        resource, Dumper=_Dumper, default_flow_style=False, sort_keys=False
+    )
 
 
 def detect_content_type(content: str) -> str:
@@ -255,13 +318,15 @@ def detect_content_type(content: str) -> str:
 
     Returns "markdown" or "python".
     """
-    # Check for markdown frontmatter or marimo code blocks
-    if content.strip().startswith("---"):
-        return "markdown"
+    if not content:
+        return "python"
 
-    import re
+    # Check for markdown frontmatter (plain prefix check first, the regex
+    # only matters when there is leading whitespace) or marimo code blocks
+    if content.startswith("---") or FRONTMATTER_START_RE.match(content):
+        return "markdown"
 
-    if re.search(r"```(?:python\s*\{\.marimo\}|\{python\s+marimo\})", content):
+    if MARIMO_BLOCK_RE.search(content):
         return "markdown"
 
     # Default to python
@@ -1,5 +1,6 @@
 """Status command implementation."""
 
+import json
 from datetime import datetime
 from pathlib import Path
 
@@ -40,8 +41,6 @@ def show_status(directory: str = ".") -> None:
 
 def read_swap_file_direct(swap_path: Path) -> SwapMeta | None:
     """Read swap file directly from path."""
-    import json
-
     if not swap_path.exists():
         return None
     try:
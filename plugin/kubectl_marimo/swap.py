@@ -1,6 +1,7 @@
 """Swap file management for tracking deployments."""
 
 import json
+import os
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
@@ -17,6 +18,8 @@ class SwapMeta:
     original_file: str
     file_hash: str
     local_mounts: list[dict] | None = None  # [{"local": "/path", "remote": "/mount"}]
+    # Cached so later commands need not re-read the file to detect it
+    content_type: str | None = None  # "python" or "markdown"
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -30,6 +33,7 @@ class SwapMeta:
             original_file=data["original_file"],
             file_hash=data["file_hash"],
             local_mounts=data.get("local_mounts"),
+            content_type=data.get("content_type"),
         )
 
 
@@ -77,13 +81,15 @@ def create_swap_meta(
     original_file: str,
     file_hash: str,
     local_mounts: list[dict] | None = None,
+    content_type: str | None = None,
 ) -> SwapMeta:
     """Create new swap metadata."""
     return SwapMeta(
         name=name,
         namespace=namespace,
         applied_at=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-        original_file=str(Path(original_file).resolve()),
+        original_file=os.path.abspath(original_file),
         file_hash=file_hash,
         local_mounts=local_mounts,
+        content_type=content_type,
     )
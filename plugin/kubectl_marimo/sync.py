@@ -7,7 +7,12 @@ from pathlib import Path
 import click
 
 from .k8s import exec_in_pod
-from .resources import compute_hash, detect_content_type
+from .resources import (
+    compute_file_hash,
+    compute_hash,
+    detect_content_type,
+    normalize_newlines,
+)
 from .swap import read_swap_file, write_swap_file
 
 
@@ -78,9 +83,20 @@ def sync_notebook(
         click.echo(f"Synced mounts from {namespace}/{meta.name}")
         return
 
+    # Content type is cached in newer swap files; only then can the
+    # modification check stream the file instead of reading it whole
+    content_type = meta.content_type
+    local_bytes = None
+    if content_type is None:
+        local_bytes = normalize_newlines(path.read_bytes()) if path.exists() else b""
+        content_type = detect_content_type(local_bytes.decode("utf-8"))
+
     # Check for local modifications
     if not force and path.exists():
-        current_hash = compute_hash(path.read_text())
+        if local_bytes is not None:
+            current_hash = compute_hash(local_bytes)
+        else:
+            current_hash = compute_file_hash(path)
         if current_hash != meta.file_hash:
             click.echo(f"Warning: Local file '{file_path}' modified since deploy.")
             if not click.confirm("Overwrite with pod content?"):
@@ -88,13 +104,13 @@ def sync_notebook(
                 return
 
     # Determine notebook filename in pod
-    content_type = detect_content_type(path.read_text() if path.exists() else "")
     if content_type == "markdown":
         notebook_file = "notebook.md"
     else:
         notebook_file = "notebook.py"
 
-    # Pull content from pod via kubectl exec
+    # Pull content from pod via kubectl exec, as raw bytes so it is
+    # written and hashed without a decode/encode round trip
     success, content = exec_in_pod(
         meta.name,
         namespace,
@@ -102,14 +118,15 @@ def sync_notebook(
     )
 
     if not success:
-        click.echo(f"Error reading from pod: {content}", err=True)
+        error = content.decode(errors="replace")
+        click.echo(f"Error reading from pod: {error}", err=True)
         sys.exit(1)
 
     # Write to local file
-    path.write_text(content)
+    path.write_bytes(content)
 
     # Update swap file hash
-    meta.file_hash = compute_hash(content)
+    meta.file_hash = compute_hash(normalize_newlines(content))
     write_swap_file(file_path, meta)
 
     click.echo(f"Synced from {namespace}/{meta.name} to {file_path}")
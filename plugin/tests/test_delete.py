@@ -29,7 +29,7 @@ class TestDeleteNotebook:
             ),
             "exec_in_pod": mocker.patch(
                 "kubectl_marimo.delete.exec_in_pod",
-                return_value=(False, "pod not found"),
+                return_value=(False, b"pod not found"),
             ),
         }
         return mocks
@@ -129,3 +129,109 @@ class TestPatchResource:
         result = patch_resource("pvc", "test-pvc", "default", "{}")
 
         assert result is False
+
+
+class TestApplyResource:
+    """Tests for apply_resource function."""
+
+    def test_sends_json_manifest(self, mocker):
+        """Sends the resource to kubectl apply as JSON."""
+        import json
+
+        from kubectl_marimo.k8s import apply_resource
+
+        mock_run = mocker.patch("kubectl_marimo.k8s.subprocess.run")
+        mock_run.return_value.returncode = 0
+        mock_run.return_value.stdout = ""
+        resource = {"kind": "MarimoNotebook", "metadata": {"name": "nb"}}
+
+        assert apply_resource(resource) is True
+        payload = mock_run.call_args.kwargs["input"]
+        assert json.loads(payload) == resource
+        assert ", " not in payload and ": " not in payload
+
+
+class TestDeleteWithSwapMeta:
+    """Tests for delete_notebook using cached swap metadata."""
+
+    def test_uses_cached_name_without_parsing(self, tmp_path, mocker):
+        """Cached resource name and content type skip parsing the file."""
+        from kubectl_marimo.swap import SwapMeta
+
+        nb = tmp_path / "notebook.md"
+        nb.write_text("---\ntitle: From File\n---\n")
+        meta = SwapMeta(
+            name="deployed-name",
+            namespace="ns",
+            applied_at="2025-01-01T00:00:00Z",
+            original_file=str(nb),
+            file_hash="sha256:abc",
+            content_type="markdown",
+        )
+        mocker.patch("kubectl_marimo.delete.read_swap_file", return_value=meta)
+        mocker.patch("kubectl_marimo.delete.delete_swap_file")
+        mocker.patch("kubectl_marimo.delete.patch_resource", return_value=True)
+        mock_delete = mocker.patch(
+            "kubectl_marimo.delete.delete_resource", return_value=True
+        )
+        mock_parse = mocker.patch("kubectl_marimo.delete.parse_file_frontmatter")
+
+        delete_notebook(str(nb), no_sync=True)
+
+        mock_parse.assert_not_called()
+        assert mock_delete.call_args[0][1] == "deployed-name"
+        assert mock_delete.call_args[0][2] == "ns"
+
+    def test_sync_writes_pod_bytes(self, tmp_path, mocker):
+        """Pod content is written back as raw bytes."""
+        from kubectl_marimo.resources import compute_file_hash
+        from kubectl_marimo.swap import SwapMeta
+
+        nb = tmp_path / "notebook.py"
+        nb.write_text("import marimo\n")
+        meta = SwapMeta(
+            name="nb",
+            namespace="ns",
+            applied_at="2025-01-01T00:00:00Z",
+            original_file=str(nb),
+            file_hash=compute_file_hash(nb),
+            content_type="python",
+        )
+        mocker.patch("kubectl_marimo.delete.read_swap_file", return_value=meta)
+        mocker.patch("kubectl_marimo.delete.delete_swap_file")
+        mocker.patch("kubectl_marimo.delete.patch_resource", return_value=True)
+        mocker.patch("kubectl_marimo.delete.delete_resource", return_value=True)
+        mocker.patch(
+            "kubectl_marimo.delete.exec_in_pod",
+            return_value=(True, "import marimo  # é\n".encode()),
+        )
+
+        delete_notebook(str(nb))
+
+        assert nb.read_bytes() == "import marimo  # é\n".encode()
+
+    def test_old_swap_detects_type_from_full_file(self, tmp_path, mocker):
+        """Swap files without a content type fall back to the full file."""
+        from kubectl_marimo.resources import compute_file_hash
+        from kubectl_marimo.swap import SwapMeta
+
+        nb = tmp_path / "notebook.md"
+        nb.write_text("# Title\n" + "text\n" * 2000 + "```python {.marimo}\n```\n")
+        meta = SwapMeta(
+            name="nb",
+            namespace="ns",
+            applied_at="2025-01-01T00:00:00Z",
+            original_file=str(nb),
+            file_hash=compute_file_hash(nb),
+        )
+        mocker.patch("kubectl_marimo.delete.read_swap_file", return_value=meta)
+        mocker.patch("kubectl_marimo.delete.delete_swap_file")
+        mocker.patch("kubectl_marimo.delete.patch_resource", return_value=True)
+        mocker.patch("kubectl_marimo.delete.delete_resource", return_value=True)
+        mock_exec = mocker.patch(
+            "kubectl_marimo.delete.exec_in_pod", return_value=(True, b"# Title\n")
+        )
+
+        delete_notebook(str(nb))
+
+        assert "notebook.md" in mock_exec.call_args[0][2]
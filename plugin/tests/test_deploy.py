@@ -1,9 +1,17 @@
 """Tests for deploy module."""
 
+import io
 import socket
 
 
-from kubectl_marimo.deploy import find_available_port, get_access_token
+from kubectl_marimo.deploy import (
+    deploy_notebook,
+    find_available_port,
+    get_access_token,
+    open_notebook,
+    start_port_forward,
+    sync_local_sources,
+)
 
 
 class TestFindAvailablePort:
@@ -32,42 +40,268 @@ class TestFindAvailablePort:
         assert 1 <= port <= 65535
 
 
+class TestStartPortForward:
+    """Tests for start_port_forward function."""
+
+    def _proc(self, mocker, output):
+        proc = mocker.Mock()
+        proc.stdout = io.StringIO(output)
+        return proc
+
+    def test_uses_preferred_port(self, mocker):
+        """Forwards the service port to the same local port."""
+        proc = self._proc(mocker, "Forwarding from 127.0.0.1:2718 -> 2718\n")
+        mock_popen = mocker.patch(
+            "kubectl_marimo.deploy.subprocess.Popen", return_value=proc
+        )
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+
+        result = start_port_forward("nb", "ns", 2718)
+
+        assert result == (proc, 2718)
+        cmd = mock_popen.call_args[0][0]
+        assert "2718:2718" in cmd
+        assert cmd[cmd.index("--address") + 1] == "127.0.0.1"
+
+    def test_ignores_ipv6_only_listener(self, mocker):
+        """A [::1]-only forward is not treated as success."""
+        proc = self._proc(mocker, "Forwarding from [::1]:2718 -> 2718\n")
+        mocker.patch("kubectl_marimo.deploy.subprocess.Popen", return_value=proc)
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+
+        assert start_port_forward("nb", "ns", 2718) is None
+
+    def test_falls_back_when_port_in_use(self, mocker):
+        """Retries with a kubectl-assigned port if the preferred one is taken."""
+        busy = self._proc(
+            mocker,
+            "Unable to listen on port 2718: bind: address already in use\n",
+        )
+        ok = self._proc(mocker, "Forwarding from 127.0.0.1:40123 -> 2718\n")
+        mock_popen = mocker.patch(
+            "kubectl_marimo.deploy.subprocess.Popen", side_effect=[busy, ok]
+        )
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+
+        result = start_port_forward("nb", "ns", 2718)
+
+        assert result == (ok, 40123)
+        assert "0:2718" in mock_popen.call_args_list[1][0][0]
+
+    def test_falls_back_when_port_not_permitted(self, mocker):
+        """Retries with a kubectl-assigned port if binding is not permitted."""
+        denied = self._proc(
+            mocker,
+            "Unable to listen on port 80: Listeners failed to create with the "
+            "following errors: [unable to create listener: Error listen tcp4 "
+            "127.0.0.1:80: bind: permission denied]\n"
+            "error: unable to listen on any of the requested ports: "
+            "[{80 80}]\n",
+        )
+        ok = self._proc(mocker, "Forwarding from 127.0.0.1:40123 -> 80\n")
+        mock_popen = mocker.patch(
+            "kubectl_marimo.deploy.subprocess.Popen", side_effect=[denied, ok]
+        )
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+
+        result = start_port_forward("nb", "ns", 80)
+
+        assert result == (ok, 40123)
+        assert "0:80" in mock_popen.call_args_list[1][0][0]
+
+    def test_returns_none_on_other_errors(self, mocker):
+        """Gives up when kubectl fails for another reason."""
+        proc = self._proc(mocker, 'Error from server (NotFound): "nb" not found\n')
+        mock_popen = mocker.patch(
+            "kubectl_marimo.deploy.subprocess.Popen", return_value=proc
+        )
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+
+        assert start_port_forward("nb", "ns", 2718) is None
+        assert mock_popen.call_count == 1
+
+
 class TestGetAccessToken:
     """Tests for get_access_token function."""
 
+    def _mock_logs(self, mocker, output):
+        mock_proc = mocker.Mock()
+        mock_proc.stdout = io.StringIO(output)
+        return mocker.patch("subprocess.Popen", return_value=mock_proc)
+
     def test_extracts_token_from_logs(self, mocker):
         """Extracts access token from marimo log output."""
-        mock_result = mocker.Mock()
-        mock_result.stdout = """
+        self._mock_logs(
+            mocker,
+            """
         Create or edit notebooks in your browser
         URL: http://0.0.0.0:2718?access_token=ABC123XYZ
         Network: http://10.0.0.1:2718?access_token=ABC123XYZ
-        """
-        mock_result.returncode = 0
-
-        mocker.patch("subprocess.run", return_value=mock_result)
+        """,
+        )
 
         token = get_access_token("test", "default")
         assert token == "ABC123XYZ"
 
     def test_returns_none_when_no_token(self, mocker):
         """Returns None when no access token in logs."""
-        mock_result = mocker.Mock()
-        mock_result.stdout = "Some other log output without token"
-        mock_result.returncode = 0
-
-        mocker.patch("subprocess.run", return_value=mock_result)
+        self._mock_logs(mocker, "Some other log output without token")
 
         token = get_access_token("test", "default")
         assert token is None
 
     def test_returns_none_on_empty_output(self, mocker):
         """Returns None when logs are empty."""
-        mock_result = mocker.Mock()
-        mock_result.stdout = ""
-        mock_result.returncode = 0
-
-        mocker.patch("subprocess.run", return_value=mock_result)
+        self._mock_logs(mocker, "")
 
         token = get_access_token("test", "default")
         assert token is None
+
+    def test_follows_logs(self, mocker):
+        """Streams logs with -f and stops the process afterwards."""
+        mock_popen = self._mock_logs(mocker, "access_token=TOKEN\n")
+
+        get_access_token("test", "default")
+
+        args = mock_popen.call_args[0][0]
+        assert "-f" in args
+        # Full log: the token line may be old on a long-running pod
+        assert not any(a.startswith("--tail") for a in args)
+        mock_popen.return_value.terminate.assert_called()
+
+
+class TestSyncLocalSources:
+    """Tests for sync_local_sources function."""
+
+    def test_batches_mkdir_and_cleanup(self, mocker, tmp_path):
+        """Creates and cleans all mount points with one exec each."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        mock_run = mocker.patch("kubectl_marimo.deploy.subprocess.run")
+        mock_run.return_value.returncode = 0
+
+        ok = sync_local_sources(
+            "pod",
+            "ns",
+            [(str(tmp_path / "a"), "/mnt/a"), (str(tmp_path / "b"), "/mnt/b")],
+        )
+
+        assert ok
+        # mkdir + 2x cp + cleanup
+        assert mock_run.call_count == 4
+        mkdir_args = mock_run.call_args_list[0][0][0]
+        assert mkdir_args[-3:] == ["-p", "/mnt/a", "/mnt/b"]
+        cleanup_args = mock_run.call_args_list[-1][0][0]
+        assert "find" in cleanup_args
+        assert "/mnt/a" in cleanup_args
+        assert "/mnt/b" in cleanup_args
+
+    def test_skips_missing_local_path(self, mocker, tmp_path):
+        """Warns and skips local paths that do not exist."""
+        mock_run = mocker.patch("kubectl_marimo.deploy.subprocess.run")
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+
+        ok = sync_local_sources("pod", "ns", [(str(tmp_path / "missing"), "/mnt")])
+
+        assert not ok
+        mock_run.assert_not_called()
+
+
+class TestOpenNotebook:
+    """Tests for open_notebook function."""
+
+    def test_opens_url_with_token(self, mocker):
+        """Token lookup and port-forward feed the browser URL."""
+        mocker.patch("kubectl_marimo.deploy.wait_for_ready", return_value=True)
+        mocker.patch("kubectl_marimo.deploy.get_access_token", return_value="TOK")
+        pf_proc = mocker.Mock()
+        mocker.patch(
+            "kubectl_marimo.deploy.start_port_forward", return_value=(pf_proc, 2719)
+        )
+        mock_browser = mocker.patch("kubectl_marimo.deploy.webbrowser.open")
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+
+        open_notebook("nb", "ns", 2718, "nb.py")
+
+        mock_browser.assert_called_once_with("http://127.0.0.1:2719?access_token=TOK")
+        pf_proc.wait.assert_called_once()
+
+    def test_auth_disabled_skips_token_lookup(self, mocker):
+        """With auth: none there is no token to wait for."""
+        mocker.patch("kubectl_marimo.deploy.wait_for_ready", return_value=True)
+        mock_token = mocker.patch("kubectl_marimo.deploy.get_access_token")
+        pf_proc = mocker.Mock()
+        mocker.patch(
+            "kubectl_marimo.deploy.start_port_forward", return_value=(pf_proc, 2718)
+        )
+        mock_browser = mocker.patch("kubectl_marimo.deploy.webbrowser.open")
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+
+        open_notebook("nb", "ns", 2718, "nb.py", auth_disabled=True)
+
+        mock_token.assert_not_called()
+        mock_browser.assert_called_once_with("http://127.0.0.1:2718")
+
+
+class TestDeployNotebook:
+    """Tests for deploy_notebook function."""
+
+    def test_dry_run_prints_yaml(self, mocker, tmp_path):
+        """Dry run prints the resource and does not track the deployment."""
+        nb = tmp_path / "notebook.md"
+        nb.write_text("---\ntitle: My Notebook\n---\n# Hi\n")
+        mock_echo = mocker.patch("kubectl_marimo.deploy.click.echo")
+        mock_apply = mocker.patch("kubectl_marimo.deploy.apply_resource")
+
+        deploy_notebook(str(nb), dry_run=True)
+
+        output = mock_echo.call_args_list[0][0][0]
+        assert "name: my-notebook" in output
+        mock_apply.assert_not_called()
+        assert not (tmp_path / ".notebook.md.marimo").exists()
+
+    def test_headless_writes_swap_file(self, mocker, tmp_path):
+        """Headless deploy applies the resource and writes tracking metadata."""
+        from kubectl_marimo.resources import compute_file_hash
+        from kubectl_marimo.swap import read_swap_file
+
+        nb = tmp_path / "notebook.py"
+        nb.write_text("import marimo\napp = marimo.App()\n")
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+        mocker.patch("kubectl_marimo.deploy.apply_resource", return_value=True)
+
+        deploy_notebook(str(nb), namespace="ns", headless=True)
+
+        meta = read_swap_file(str(nb))
+        assert meta.name == "notebook"
+        assert meta.namespace == "ns"
+        assert meta.file_hash == compute_file_hash(nb)
+        assert meta.content_type == "python"
+
+    def test_crlf_python_notebook(self, mocker, tmp_path):
+        """CRLF notebooks keep their [tool.marimo.k8s] config and hash."""
+        from kubectl_marimo.resources import compute_hash
+        from kubectl_marimo.swap import read_swap_file
+
+        nb = tmp_path / "notebook.py"
+        nb.write_bytes(
+            b"# /// script\r\n"
+            b'# dependencies = ["marimo"]\r\n'
+            b"# ///\r\n"
+            b"# [tool.marimo.k8s]\r\n"
+            b'# image = "custom:1"\r\n'
+            b"# port = 9000\r\n"
+            b"import marimo\r\n"
+        )
+        mocker.patch("kubectl_marimo.deploy.click.echo")
+        mock_apply = mocker.patch(
+            "kubectl_marimo.deploy.apply_resource", return_value=True
+        )
+
+        deploy_notebook(str(nb), namespace="ns", headless=True)
+
+        spec = mock_apply.call_args[0][0]["spec"]
+        assert spec["image"] == "custom:1"
+        assert spec["port"] == 9000
+        # Same hash as the newline-normalized text used before
+        assert read_swap_file(str(nb)).file_hash == compute_hash(nb.read_text())
@@ -1,5 +1,6 @@
 """Tests for format parsers."""
 
+from kubectl_marimo.formats import parse_file_frontmatter
 from kubectl_marimo.formats.markdown import (
     parse_markdown,
     extract_frontmatter,
@@ -101,6 +102,16 @@ body without closing"""
         fm = extract_frontmatter(content)
         assert fm is None
 
+    def test_crlf_line_endings(self):
+        content = "---\r\ntitle: Test\r\n---\r\nbody\r\n"
+        fm = extract_frontmatter(content)
+        assert fm == {"title": "Test"}
+
+    def test_rejects_python_tags(self):
+        """Frontmatter is loaded with a safe loader."""
+        content = "---\ntitle: !!python/object/apply:os.getcwd []\n---\nbody"
+        assert extract_frontmatter(content) is None
+
 
 class TestIsMarimoMarkdown:
     def test_has_frontmatter(self):
@@ -193,3 +204,27 @@ class TestIsMaimoPython:
 
     def test_not_marimo(self):
         assert not is_marimo_python("import pandas\ndf = pandas.DataFrame()")
+
+
+class TestParseFileFrontmatter:
+    def test_markdown_frontmatter_in_head(self, tmp_path):
+        path = tmp_path / "notebook.md"
+        path.write_text("---\ntitle: Test\n---\n" + "text\n" * 5000)
+        head, fm = parse_file_frontmatter(str(path), limit=20)
+        assert fm == {"title": "Test"}
+        assert head == "---\ntitle: Test\n---\n"
+
+    def test_reads_rest_without_frontmatter(self, tmp_path):
+        path = tmp_path / "notebook.py"
+        path.write_text("x = 1\n" * 100)
+        content, fm = parse_file_frontmatter(str(path), limit=10)
+        assert fm is None
+        assert content == "x = 1\n" * 100
+
+    def test_falls_back_to_full_file(self, tmp_path):
+        path = tmp_path / "notebook.md"
+        long_value = "x" * 10000
+        path.write_text(f"---\ntitle: Test\nnote: {long_value}\n---\nbody\n")
+        _, fm = parse_file_frontmatter(str(path))
+        assert fm["title"] == "Test"
+        assert fm["note"] == long_value
@@ -4,6 +4,7 @@ import pytest
 
 from kubectl_marimo.resources import (
     compute_hash,
+    compute_file_hash,
     slugify,
     resource_name,
     build_marimo_notebook,
@@ -12,6 +13,7 @@ from kubectl_marimo.resources import (
     parse_mount_uri,
     filter_mounts,
     build_ssh_sidecar,
+    to_yaml,
 )
 
 
@@ -31,6 +33,58 @@ class TestComputeHash:
         h2 = compute_hash("content2")
         assert h1 != h2
 
+    def test_matches_operator_format(self):
+        # Same as the operator's ContentHash: first 8 bytes of SHA256, in hex
+        assert compute_hash("hello world") == "sha256:b94d27b9934d3e08"
+
+    def test_accepts_bytes(self):
+        assert compute_hash(b"hello world") == compute_hash("hello world")
+        assert compute_hash("héllo".encode()) == compute_hash("héllo")
+
+    def test_blake2b(self):
+        h = compute_hash("hello world", algorithm="blake2b")
+        assert h.startswith("blake2b:")
+        assert len(h) == len("blake2b:") + 16
+        assert h != compute_hash("hello world!", algorithm="blake2b")
+
+    def test_unknown_algorithm(self):
+        with pytest.raises(ValueError):
+            compute_hash("test", algorithm="md5")
+
+
+class TestComputeFileHash:
+    def test_matches_compute_hash(self, tmp_path):
+        path = tmp_path / "notebook.py"
+        path.write_text("import marimo\napp = marimo.App()\n")
+        assert compute_file_hash(path) == compute_hash(path.read_text())
+
+    def test_large_file(self, tmp_path):
+        content = "x = 1\n" * 50000
+        path = tmp_path / "notebook.py"
+        path.write_text(content)
+        assert compute_file_hash(path) == compute_hash(content)
+
+    def test_crlf_matches_read_text(self, tmp_path):
+        path = tmp_path / "notebook.py"
+        path.write_bytes(b"import marimo\r\napp = marimo.App()\r\nold\rmac\n")
+        assert compute_file_hash(path) == compute_hash(path.read_text())
+
+    def test_crlf_split_across_chunks(self, tmp_path):
+        """A CRLF straddling the 64 KiB read boundary is one newline."""
+        data = b"x" * 65535 + b"\r\n" + b"y\r\n" * 10
+        path = tmp_path / "notebook.py"
+        path.write_bytes(data)
+        assert compute_file_hash(path) == compute_hash(path.read_text())
+
+    def test_rehashes_after_change(self, tmp_path):
+        path = tmp_path / "notebook.py"
+        path.write_text("a = 1\n")
+        h1 = compute_file_hash(path)
+        path.write_text("a = 22\n")
+        h2 = compute_file_hash(path)
+        assert h1 != h2
+        assert h2 == compute_hash("a = 22\n")
+
 
 class TestSlugify:
     def test_lowercase(self):
@@ -42,6 +96,12 @@ class TestSlugify:
     def test_strip_dashes(self):
         assert slugify("--my-notebook--") == "my-notebook"
 
+    def test_collapses_runs(self):
+        assert slugify("my  --  notebook") == "my-notebook"
+
+    def test_non_ascii(self):
+        assert slugify("Café Überblick") == "caf-berblick"
+
     def test_max_length(self):
         long_name = "a" * 100
         result = slugify(long_name)
@@ -61,6 +121,18 @@ class TestResourceName:
         name = resource_name("/path/to/other.py", {"title": "Preferred Name"})
         assert name == "preferred-name"
 
+    def test_directory(self, tmp_path):
+        notebooks = tmp_path / "My Notebooks"
+        notebooks.mkdir()
+        assert resource_name(str(notebooks)) == "my-notebooks"
+        assert resource_name(str(notebooks) + "/") == "my-notebooks"
+
+    def test_current_directory(self, tmp_path, monkeypatch):
+        project = tmp_path / "project"
+        project.mkdir()
+        monkeypatch.chdir(project)
+        assert resource_name(".") == "project"
+
 
 class TestBuildMarimoNotebook:
     def test_basic(self):
@@ -81,6 +153,13 @@ class TestBuildMarimoNotebook:
         assert rsync_mounts == []
         assert sshfs_mounts == []
 
+    def test_resources_are_independent(self):
+        first, _, _ = build_marimo_notebook("a", "ns", "content")
+        second, _, _ = build_marimo_notebook("b", None, "content")
+        first["kind"] = "Changed"
+        assert second["kind"] == "MarimoNotebook"
+        assert second["metadata"] == {"name": "b"}
+
     def test_with_image(self):
         resource, _, _ = build_marimo_notebook(
             name="test",
@@ -117,6 +196,31 @@ class TestBuildMarimoNotebook:
         )
         assert resource["spec"]["auth"] == {}
 
+    def test_auth_other_value_ignored(self):
+        resource, _, _ = build_marimo_notebook(
+            name="test",
+            namespace="default",
+            content="content",
+            frontmatter={"auth": "token"},
+        )
+        assert "auth" not in resource["spec"]
+
+    def test_spec_key_order_independent_of_frontmatter(self):
+        resource, _, _ = build_marimo_notebook(
+            name="test",
+            namespace="default",
+            content="content",
+            frontmatter={"env": {"A": "1"}, "port": 8080, "image": "img"},
+        )
+        assert list(resource["spec"]) == [
+            "mode",
+            "content",
+            "storage",
+            "image",
+            "port",
+            "env",
+        ]
+
     def test_mode_edit(self):
         resource, _, _ = build_marimo_notebook(
             name="test",
@@ -238,6 +342,23 @@ class TestBuildMarimoNotebook:
         assert len(sshfs_mounts) == 1
 
 
+class TestToYaml:
+    def test_roundtrip(self):
+        import yaml
+
+        resource, _, _ = build_marimo_notebook(
+            name="test",
+            namespace="default",
+            content="import marimo\n",
+            frontmatter={"env": {"DEBUG": "true"}},
+        )
+        assert yaml.safe_load(to_yaml(resource)) == resource
+
+    def test_preserves_key_order(self):
+        out = to_yaml({"apiVersion": "v1", "kind": "X", "metadata": {}})
+        assert out.index("apiVersion") < out.index("kind") < out.index("metadata")
+
+
 class TestParseEnv:
     def test_inline_value(self):
         result = parse_env({"DEBUG": "true"})
@@ -268,12 +389,30 @@ class TestParseEnv:
         assert debug_var["value"] == "true"
         assert "valueFrom" in api_var
 
+    def test_preserves_order(self):
+        """Order matters for $(VAR) references between env vars."""
+        result = parse_env(
+            {
+                "TOKEN": {"secret": "my-secret"},
+                "URL": "https://api?token=$(TOKEN)",
+            }
+        )
+        assert [e["name"] for e in result] == ["TOKEN", "URL"]
+
+    def test_skips_invalid_entries(self):
+        result = parse_env({"PORT": 8080, "BAD": {"key": "k"}, "DEBUG": "true"})
+        assert result == [{"name": "DEBUG", "value": "true"}]
+
 
 class TestDetectContentType:
     def test_markdown_frontmatter(self):
         content = "---\ntitle: Test\n---\n# Heading"
         assert detect_content_type(content) == "markdown"
 
+    def test_markdown_frontmatter_leading_whitespace(self):
+        content = "\n  ---\ntitle: Test\n---\n# Heading"
+        assert detect_content_type(content) == "markdown"
+
     def test_markdown_code_block(self):
         content = "# Title\n```python {.marimo}\nprint('hi')\n```"
         assert detect_content_type(content) == "markdown"
@@ -315,6 +454,10 @@ class TestParseMountUri:
         with pytest.raises(ValueError):
             parse_mount_uri("invalid")
 
+    def test_invalid_scheme(self):
+        with pytest.raises(ValueError):
+            parse_mount_uri("./data://path")
+
 
 class TestFilterMounts:
     def test_separates_schemes(self):
@@ -341,12 +484,25 @@ class TestFilterMounts:
         assert rsync[0][1] == "/home/marimo/notebooks/mounts/local-0"
         assert rsync[1][1] == "/home/marimo/notebooks/mounts/local-1"
 
+    def test_rsync_default_mount_point_uses_list_position(self):
+        """Default mount points stay stable when other mounts are listed."""
+        mounts = ["cw://bucket", "rsync://./src:/dest", "rsync://./data"]
+        cw, rsync, sshfs = filter_mounts(mounts)
+        assert rsync[1][1] == "/home/marimo/notebooks/mounts/local-2"
+
     def test_rsync_custom_mount_point(self):
         mounts = ["rsync://./src:/dest"]
         cw, rsync, sshfs = filter_mounts(mounts)
         assert rsync[0][0] == "./src"
         assert rsync[0][1] == "/dest"
 
+    def test_rsync_colon_without_mount_point(self):
+        """Only a trailing ':/...' is treated as a mount point."""
+        mounts = ["rsync://./a:/b:c"]
+        cw, rsync, sshfs = filter_mounts(mounts)
+        assert rsync[0][0] == "./a:/b:c"
+        assert rsync[0][1] == "/home/marimo/notebooks/mounts/local-0"
+
     def test_sshfs_mount_info(self):
         mounts = ["sshfs:///home/marimo/notebooks"]
         cw, rsync, sshfs = filter_mounts(mounts)
@@ -355,6 +511,22 @@ class TestFilterMounts:
         assert remote_path == "/home/marimo/notebooks"
         assert local_mount.startswith("./marimo-mount-")
 
+    def test_does_not_parse_uris(self, mocker):
+        mock_parse = mocker.patch("kubectl_marimo.resources.parse_mount_uri")
+        cw, rsync, sshfs = filter_mounts(["rsync://./a", "sshfs:///b", "cw://c"])
+        mock_parse.assert_not_called()
+        assert (cw, rsync, sshfs) == (
+            ["cw://c"],
+            [("./a", "/home/marimo/notebooks/mounts/local-0", "rsync")],
+            [("/b", "./marimo-mount-1")],
+        )
+
+    def test_accepts_iterator(self):
+        mounts = iter(["cw://bucket", "rsync://./src:/dest"])
+        cw, rsync, sshfs = filter_mounts(mounts)
+        assert cw == ["cw://bucket"]
+        assert rsync == [("./src", "/dest", "rsync")]
+
     def test_unknown_scheme_passes_through(self):
         """Unknown schemes should pass through to operator."""
         mounts = ["nfs://server/path"]
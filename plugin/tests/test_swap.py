@@ -1,5 +1,6 @@
 """Tests for swap file management."""
 
+import os
 from pathlib import Path
 
 from kubectl_marimo.swap import (
@@ -59,6 +60,16 @@ class TestCreateSwapMeta:
         assert meta.applied_at.endswith("Z")
         assert "T" in meta.applied_at
 
+    def test_original_file_is_absolute(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        meta = create_swap_meta(
+            name="test",
+            namespace="default",
+            original_file="file.py",
+            file_hash="sha256:abc",
+        )
+        assert meta.original_file == os.path.join(os.getcwd(), "file.py")
+
 
 class TestSwapFileIO:
     def test_write_read_roundtrip(self, tmp_path):
@@ -162,3 +173,32 @@ class TestSwapMetaWithMounts:
             local_mounts=[{"local": "/local", "remote": "/remote"}],
         )
         assert meta.local_mounts == [{"local": "/local", "remote": "/remote"}]
+
+
+class TestSwapMetaFrontmatterCache:
+    def test_roundtrip_cached_fields(self, tmp_path):
+        notebook_file = tmp_path / "notebook.md"
+        notebook_file.write_text("content")
+
+        meta = create_swap_meta(
+            name="test",
+            namespace="default",
+            original_file=str(notebook_file),
+            file_hash="sha256:abc",
+            content_type="markdown",
+        )
+        write_swap_file(str(notebook_file), meta)
+        loaded = read_swap_file(str(notebook_file))
+        assert loaded.content_type == "markdown"
+
+    def test_from_dict_without_cached_fields(self):
+        """Swap files written by older versions still load."""
+        d = {
+            "name": "test",
+            "namespace": "ns",
+            "applied_at": "2025-01-01T00:00:00Z",
+            "original_file": "/path",
+            "file_hash": "sha256:abc",
+        }
+        meta = SwapMeta.from_dict(d)
+        assert meta.content_type is None
@@ -1,6 +1,8 @@
 """Tests for sync module."""
 
-from kubectl_marimo.sync import sync_local_mounts
+from kubectl_marimo.resources import compute_hash
+from kubectl_marimo.swap import create_swap_meta, read_swap_file, write_swap_file
+from kubectl_marimo.sync import sync_local_mounts, sync_notebook
 
 
 class TestSyncLocalMounts:
@@ -88,3 +90,70 @@ class TestSyncLocalMounts:
         assert not marimo_file3.exists()
         # But the directory structure should remain
         assert marimo_file2.exists()
+
+
+class TestSyncNotebook:
+    def test_pulls_content_and_updates_hash(self, mocker, tmp_path):
+        """Writes pod content locally and records its hash."""
+        nb = tmp_path / "notebook.md"
+        nb.write_text("---\ntitle: Test\n---\n")
+        meta = create_swap_meta(
+            name="nb",
+            namespace="ns",
+            original_file=str(nb),
+            file_hash=compute_hash(nb.read_text()),
+        )
+        write_swap_file(str(nb), meta)
+        mock_exec = mocker.patch(
+            "kubectl_marimo.sync.exec_in_pod",
+            return_value=(True, b"---\ntitle: Edited\n---\n"),
+        )
+        mocker.patch("kubectl_marimo.sync.click.echo")
+
+        sync_notebook(str(nb))
+
+        # Content type detected from the local file (not cached in the meta)
+        assert "notebook.md" in mock_exec.call_args[0][2]
+        assert nb.read_text() == "---\ntitle: Edited\n---\n"
+        assert read_swap_file(str(nb)).file_hash == compute_hash(nb.read_text())
+
+    def test_modified_file_cancel(self, mocker, tmp_path):
+        """Prompts before overwriting a locally modified file."""
+        nb = tmp_path / "notebook.py"
+        nb.write_text("import marimo\n")
+        meta = create_swap_meta(
+            name="nb", namespace="ns", original_file=str(nb), file_hash="sha256:old"
+        )
+        write_swap_file(str(nb), meta)
+        mock_exec = mocker.patch("kubectl_marimo.sync.exec_in_pod")
+        mocker.patch("kubectl_marimo.sync.click.echo")
+        mocker.patch("kubectl_marimo.sync.click.confirm", return_value=False)
+
+        sync_notebook(str(nb))
+
+        mock_exec.assert_not_called()
+        assert nb.read_text() == "import marimo\n"
+
+    def test_cached_content_type_streams_hash(self, mocker, tmp_path):
+        """With a cached content type, the local file is only hashed."""
+        nb = tmp_path / "notebook.py"
+        nb.write_text("import marimo\n")
+        meta = create_swap_meta(
+            name="nb",
+            namespace="ns",
+            original_file=str(nb),
+            file_hash=compute_hash("import marimo\n"),
+            content_type="markdown",
+        )
+        write_swap_file(str(nb), meta)
+        mock_detect = mocker.patch("kubectl_marimo.sync.detect_content_type")
+        mock_exec = mocker.patch(
+            "kubectl_marimo.sync.exec_in_pod", return_value=(True, b"# pod\n")
+        )
+        mocker.patch("kubectl_marimo.sync.click.echo")
+
+        sync_notebook(str(nb))
+
+        mock_detect.assert_not_called()
+        assert "notebook.md" in mock_exec.call_args[0][2]
+        assert nb.read_bytes() == b"# pod\n"